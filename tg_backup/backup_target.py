@@ -2,11 +2,10 @@ import asyncio
 import datetime
 import logging
 
-import telethon
 from prometheus_client import Counter, Summary
 from telethon import TelegramClient
 
-from tg_backup.config import TargetConfig, StorableData
+from tg_backup.config import TargetConfig, StorableData, SCHEME_LAYER
 from tg_backup.encoding import encode_message
 from tg_backup.resource_downloader import ResourceDownloader
 from tg_backup.tg_utils import get_chat_name
@@ -41,8 +40,7 @@ class BackupTarget:
         chat_id = self.config.chat_id
         last_message_id = self.state.latest_msg_id
         self.state.latest_start_time = datetime.datetime.now(datetime.timezone.utc)
-        # noinspection PyUnresolvedReferences
-        self.state.scheme_layer = telethon.tl.alltlobjects.LAYER
+        self.state.tl_scheme_layer = SCHEME_LAYER
 
         # Setup chat info
         with time_taken_setup_chat.time():
@@ -87,7 +85,9 @@ class BackupTarget:
                 processed_count,
                 self.resource_downloader.dl_queue.qsize(),
             )
-            # Handle downloadable resources
+            # Handle downloadable resources, stopping early if the resource downloader has failed
+            if resource_dl_task.done():
+                await resource_dl_task
             for resource in encoded_msg.downloadable_resources:
                 await self.resource_downloader.add_resource(resource)
             # Metrics
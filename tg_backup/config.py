@@ -24,7 +24,7 @@ def encode_json_extra(value: object) -> str:
         raise ValueError(f"Unrecognised type to encode: {value}")
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class StorableData:
     raw_data: Dict
     tl_scheme_layer: int = SCHEME_LAYER
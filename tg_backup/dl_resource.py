@@ -17,12 +17,16 @@ from tg_backup.tg_utils import get_from_obj_by_path
 logger = logging.getLogger(__name__)
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class DLResource:
     msg: Message
     json_path: str
     raw_data: Dict
 
+    # Kept short for logging, as the dataclass repr includes the full raw data and message
+    def __str__(self) -> str:
+        return f"{type(self).__name__}({self.json_path})"
+
     @abstractmethod
     def __hash__(self) -> int:
         raise NotImplementedError
@@ -36,21 +40,25 @@ class DLResource:
         raise NotImplementedError
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class DLResourcePeerID(DLResource):
     """This seems to be just for bot IDs really"""
     peer_id: int
 
+    def __str__(self) -> str:
+        return f"{type(self).__name__}({self.peer_id})"
+
+    # Peer resources hash on the bare ID, as a peer ID resource compares equal to any user, chat, or channel with that ID
     def __hash__(self) -> int:
-        return hash(("peer_id", self.peer_id))
+        return hash(("peer", self.peer_id))
 
     def __eq__(self, other) -> bool:
-        return any([
-            isinstance(other, DLResourcePeerID) and self.peer_id == other.peer_id,
-            isinstance(other, DLResourcePeerUser) and self.peer_id == other.user_id,
-            isinstance(other, DLResourcePeerChat) and self.peer_id == other.chat_id,
-            isinstance(other, DLResourcePeerChannel) and self.peer_id == other.channel_id,
-        ])
+        return (
+            (isinstance(other, DLResourcePeerID) and self.peer_id == other.peer_id)
+            or (isinstance(other, DLResourcePeerUser) and self.peer_id == other.user_id)
+            or (isinstance(other, DLResourcePeerChat) and self.peer_id == other.chat_id)
+            or (isinstance(other, DLResourcePeerChannel) and self.peer_id == other.channel_id)
+        )
 
     async def download(self, client: TelegramClient, output: OutputConfig) -> None:
         chat_data = output.chats.load_chat(self.peer_id)
@@ -62,15 +70,21 @@ class DLResourcePeerID(DLResource):
         output.chats.save_chat(self.peer_id, StorableData(user_full_data))
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class DLResourcePeerUser(DLResource):
     user_id: int
 
+    def __str__(self) -> str:
+        return f"{type(self).__name__}({self.user_id})"
+
     def __hash__(self) -> int:
-        return hash(("peer_user", self.user_id))
+        return hash(("peer", self.user_id))
 
     def __eq__(self, other) -> bool:
-        return isinstance(other, DLResourcePeerUser) and self.user_id == other.user_id
+        return (
+            (isinstance(other, DLResourcePeerUser) and self.user_id == other.user_id)
+            or (isinstance(other, DLResourcePeerID) and self.user_id == other.peer_id)
+        )
 
     async def download(self, client: TelegramClient, output: OutputConfig) -> None:
         chat_data = output.chats.load_chat(self.user_id)
@@ -82,15 +96,21 @@ class DLResourcePeerUser(DLResource):
         output.chats.save_chat(self.user_id, StorableData(user_full_data))
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class DLResourcePeerChat(DLResource):
     chat_id: int
 
+    def __str__(self) -> str:
+        return f"{type(self).__name__}({self.chat_id})"
+
     def __hash__(self) -> int:
-        return hash(("peer_chat", self.chat_id))
+        return hash(("peer", self.chat_id))
 
     def __eq__(self, other) -> bool:
-        return isinstance(other, DLResourcePeerChat) and self.chat_id == other.chat_id
+        return (
+            (isinstance(other, DLResourcePeerChat) and self.chat_id == other.chat_id)
+            or (isinstance(other, DLResourcePeerID) and self.chat_id == other.peer_id)
+        )
 
     async def download(self, client: TelegramClient, output: OutputConfig) -> None:
         chat_data = output.chats.load_chat(self.chat_id)
@@ -102,15 +122,21 @@ class DLResourcePeerChat(DLResource):
         output.chats.save_chat(self.chat_id, StorableData(chat_full_data))
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class DLResourcePeerChannel(DLResource):
     channel_id: int
 
+    def __str__(self) -> str:
+        return f"{type(self).__name__}({self.channel_id})"
+
     def __hash__(self) -> int:
-        return hash(("peer_channel", self.channel_id))
+        return hash(("peer", self.channel_id))
 
     def __eq__(self, other) -> bool:
-        return isinstance(other, DLResourcePeerChannel) and self.channel_id == other.channel_id
+        return (
+            (isinstance(other, DLResourcePeerChannel) and self.channel_id == other.channel_id)
+            or (isinstance(other, DLResourcePeerID) and self.channel_id == other.peer_id)
+        )
 
     async def download(self, client: TelegramClient, output: OutputConfig) -> None:
         chat_data = output.chats.load_chat(self.channel_id)
@@ -130,14 +156,17 @@ class DLResourcePeerChannel(DLResource):
         output.chats.save_chat(self.channel_id, StorableData(chat_full_data))
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class DLResourceMedia(DLResource):
     media_id: int
     access_hash: int
     file_reference: bytes
 
+    def __str__(self) -> str:
+        return f"{type(self).__name__}({self.media_id})"
+
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class DLResourcePhoto(DLResourceMedia):
     photo_size_type: str  # TODO: separate folders for photos and web previews?
 
@@ -170,7 +199,7 @@ class DLResourcePhoto(DLResourceMedia):
         output.photos.save_metadata(self.media_id, StorableData(self.raw_data))
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class DLResourceDocument(DLResourceMedia):
 
     def __hash__(self) -> int:
@@ -183,8 +212,8 @@ class DLResourceDocument(DLResourceMedia):
         for attr in self.raw_data["attributes"]:
             if attr["_"] == "DocumentAttributeFilename":
                 return attr["file_name"].split(".")[-1]
-        if self.raw_data["mime_type"]:
-            return self.raw_data["mime_type"].split("/")[-1]
+        if mime_type := self.raw_data["mime_type"]:
+            return mime_type.split("/")[-1]
         return "unknown"
 
     async def download(self, client: TelegramClient, output: OutputConfig) -> None:
@@ -207,7 +236,7 @@ class DLResourceDocument(DLResourceMedia):
         output.documents.save_metadata(self.media_id, StorableData(self.raw_data))
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class DLResourceMediaUnknown(DLResourceMedia):
     pass
 
@@ -236,10 +265,11 @@ def search_for_resources(msg: Message, raw_data: Any, json_path: str) -> Optiona
     access_hash = raw_data.get("access_hash")
     file_ref = raw_data.get("file_reference")
     if maybe_id and access_hash and file_ref:
-        if raw_data["_"] == "Photo":
+        tl_type = raw_data["_"]
+        if tl_type == "Photo":
             photo_size = raw_data["sizes"][-1]["type"]
             resources.append(DLResourcePhoto(msg, json_path, raw_data, maybe_id, access_hash, file_ref, photo_size))
-        elif raw_data["_"] == "Document":
+        elif tl_type == "Document":
             resources.append(DLResourceDocument(msg, json_path, raw_data, maybe_id, access_hash, file_ref))
         else:
             resources.append(DLResourceMediaUnknown(msg, json_path, raw_data, maybe_id, access_hash, file_ref))
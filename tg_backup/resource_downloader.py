@@ -1,8 +1,8 @@
 import asyncio
 import logging
 import sys
-from asyncio import Queue, Task, QueueEmpty
-from typing import Type, Set, List
+from asyncio import Queue, Task
+from typing import Type, Set, List, Dict, Optional, FrozenSet
 
 from prometheus_client import Gauge, Counter, Summary
 from telethon import TelegramClient
@@ -38,21 +38,42 @@ resource_dl_time_taken = Summary(
     labelnames=["task"],
 )
 resource_time_taken_waiting_for_queue = resource_dl_time_taken.labels(task="waiting for resources in queue")
-resource_time_taken_skipping_revisited_resource = resource_dl_time_taken.labels(
-    task="skipping resources already downloaded"
-)
 resource_time_taken_downloading = resource_dl_time_taken.labels(task="downloading resource")
 
 
-def all_subclasses(cls: Type) -> Set[Type]:
-    return set(cls.__subclasses__()).union(
-        [subsubcls for subcls in cls.__subclasses__() for subsubcls in subcls.__subclasses__()]
+def all_subclasses(cls: Type) -> FrozenSet[Type]:
+    seen = set()
+    to_visit = list(cls.__subclasses__())
+    while to_visit:
+        subcls = to_visit.pop()
+        if subcls in seen:
+            continue
+        seen.add(subcls)
+        to_visit.extend(subcls.__subclasses__())
+    # Rebuilt classes, such as those from dataclass(slots=True), leave the discarded original listed until it is
+    # garbage collected, so only keep classes which are still bound in their module
+    return frozenset(
+        subcls for subcls in seen if getattr(sys.modules.get(subcls.__module__), subcls.__name__, None) is subcls
     )
 
 
-for resource_type in all_subclasses(DLResource):
-    resources_processed.labels(resource_type=resource_type.__name__)
-    resource_revisited.labels(resource_type=resource_type.__name__)
+DL_RESOURCE_TYPES = all_subclasses(DLResource)
+resources_processed_by_type: Dict[Type[DLResource], Counter] = {
+    resource_type: resources_processed.labels(resource_type=resource_type.__name__)
+    for resource_type in DL_RESOURCE_TYPES
+}
+resource_revisited_by_type: Dict[Type[DLResource], Counter] = {
+    resource_type: resource_revisited.labels(resource_type=resource_type.__name__)
+    for resource_type in DL_RESOURCE_TYPES
+}
+
+
+def counter_for_type(counters: Dict[Type[DLResource], Counter], metric: Counter, resource_type: Type) -> Counter:
+    # Types missed by the walk at import, such as classes not bound in their module, get their label on first use
+    counter = counters.get(resource_type)
+    if counter is None:
+        counter = counters[resource_type] = metric.labels(resource_type=resource_type.__name__)
+    return counter
 
 
 class ResourceDownloader:
@@ -60,50 +81,48 @@ class ResourceDownloader:
 
     def __init__(self, output: OutputConfig) -> None:
         self.output = output
-        self.running = False
-        self.dl_queue: Queue[DLResource] = Queue()
+        self.dl_queue: Queue[Optional[DLResource]] = Queue()
         self.completed_resources: Set[DLResource] = set()
+        self.queued_resources: Set[DLResource] = set()
         self.processors: List[Task] = []
-        resources_in_queue.set_function(lambda: self.dl_queue.qsize())
         resource_processors_active.set_function(lambda: len(self.processors))
 
     async def run(self, client: TelegramClient) -> None:
-        self.running = True
         loop = asyncio.get_event_loop()
         for _ in range(self.NUM_PROCESSORS):
             processor_task = loop.create_task(self.process_queue(client))
             self.processors.append(processor_task)
         logger.debug("Started up %s resource download processors", len(self.processors))
-        for task in self.processors:
-            await task
-        self.processors.clear()
+        try:
+            await asyncio.gather(*self.processors)
+        except Exception:
+            for processor_task in self.processors:
+                processor_task.cancel()
+            self.clear_queue()
+            raise
+        finally:
+            self.processors.clear()
         logger.debug("All resource download processors complete")
 
     async def process_queue(self, client: TelegramClient) -> None:
         while True:
-            try:
-                next_resource = self.dl_queue.get_nowait()  # TODO: ability to prioritise small downloads first
-            except QueueEmpty:
-                if not self.running:
-                    return
-                with resource_time_taken_waiting_for_queue.time():
-                    await asyncio.sleep(0.3)
-                continue
-            with resource_time_taken_skipping_revisited_resource.time():
-                if next_resource in self.completed_resources:
-                    self.dl_queue.task_done()
-                    resource_revisited.labels(resource_type=type(next_resource).__name__).inc()
-                    continue  # TODO: have file size limits for download
+            with resource_time_taken_waiting_for_queue.time():
+                next_resource = await self.dl_queue.get()  # TODO: ability to prioritise small downloads first
+            if next_resource is None:
+                self.dl_queue.task_done()
+                return
+            resources_in_queue.dec()
             logger.info("Downloading resource: %s", next_resource)
             with resource_time_taken_downloading.time():
                 try:
                     await next_resource.download(client, self.output)
                 except Exception as e:
                     logger.critical("Failed to download resource %s, shutting down", next_resource, exc_info=e)
-                    sys.exit(1)
+                    raise
             self.completed_resources.add(next_resource)
+            self.queued_resources.discard(next_resource)
             self.dl_queue.task_done()
-            resources_processed.labels(resource_type=type(next_resource).__name__).inc()
+            counter_for_type(resources_processed_by_type, resources_processed, type(next_resource)).inc()
             logger.info(
                 "Resource downloaded. Total downloaded: %s. Resources in queue: %s",
                 len(self.completed_resources),
@@ -111,11 +130,22 @@ class ResourceDownloader:
             )
 
     async def add_resource(self, resource: DLResource) -> None:
-        if resource in self.completed_resources:
-            return
+        if resource in self.completed_resources or resource in self.queued_resources:
+            counter_for_type(resource_revisited_by_type, resource_revisited, type(resource)).inc()
+            return  # TODO: have file size limits for download
+        self.queued_resources.add(resource)
         await self.dl_queue.put(resource)
+        resources_in_queue.inc()
+
+    def clear_queue(self) -> None:
+        # Remove whatever failed processors left queued, so it no longer counts towards the shared queue gauge
+        while not self.dl_queue.empty():
+            if self.dl_queue.get_nowait() is not None:
+                resources_in_queue.dec()
+            self.dl_queue.task_done()
 
     async def stop(self) -> None:
-        self.running = False
-        await self.dl_queue.join()
-        logger.info("Stopped resource downloader")
+        # Each processor exits when it takes a sentinel, after everything queued before it
+        for _ in range(self.NUM_PROCESSORS):
+            await self.dl_queue.put(None)
+        logger.info("Stopping resource downloader")
@@ -1,16 +1,18 @@
+_MISSING = object()
 
 
 def get_chat_name(entity):
-    if hasattr(entity, "title"):
-        return f"#{entity.title}"
+    if (title := getattr(entity, "title", _MISSING)) is not _MISSING:
+        return f"#{title}"
     else:
         return get_user_name(entity) or str(entity.id)
 
 
 def get_user_name(user) -> str:
-    if hasattr(user, "title"):
-        return f"#{user.title}"
-    full_name = (user.first_name or "") + ("" if user.last_name is None else " " + user.last_name)
+    if (title := getattr(user, "title", _MISSING)) is not _MISSING:
+        return f"#{title}"
+    first_name = user.first_name or ""
+    full_name = first_name if user.last_name is None else f"{first_name} {user.last_name}"
     if full_name == "":
         return "DELETED_ACCOUNT"
     return full_name
@@ -28,7 +30,7 @@ def get_from_obj_by_path(obj: object, json_path: str) -> object:
         first_key, index_str = first_key[:-1].split("[", 1)
         index = int(index_str)
     # Fetch the thing
-    sub_obj = obj.__getattribute__(first_key)
+    sub_obj = getattr(obj, first_key)
     if index is not None:
         sub_obj = sub_obj[index]
     # Return